@@ -1,4 +1,4 @@
-__version__ = "1.0.1"
+__version__ = "2.0.0"
 
 try:
     from coconut.question import Question, QuestionGroup
@@ -6,5 +6,6 @@ try:
     from coconut.response import Response
     from coconut.workbook import Workbook
     from coconut.lime import LimeAPI
+    from coconut.async_lime import AsyncLimeAPI
 except ImportError:
     pass
\ No newline at end of file
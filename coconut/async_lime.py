@@ -0,0 +1,383 @@
+import asyncio
+import collections
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+
+from loguru import logger
+from tinyrpc.exc import RPCError
+from tinyrpc.protocols.jsonrpc import JSONRPCErrorResponse, JSONRPCProtocol
+
+from coconut.lime import BaseLimeAPI
+
+
+# Maps export completion statuses to the matching `get_summary` response count
+_summary_counts = {
+    "all": "full_responses",
+    "complete": "completed_responses",
+    "incomplete": "incomplete_responses",
+}
+
+
+class AsyncLimeAPI(BaseLimeAPI):
+    """
+    Asynchronous LimeSurvey API Client for Remote API 2.
+        Exposes the same endpoints as `LimeAPI`, but as coroutines, so that
+        independent requests can be awaited concurrently (e.g. with
+        `asyncio.gather`). All requests share a single `httpx.AsyncClient`
+        which keeps HTTP/2 connections alive between calls.
+    """
+
+    def __init__(
+        self,
+        url,
+        username,
+        password,
+        headers=None,
+        timeout=None,
+        max_keepalive_connections=20,
+    ):
+        """
+        Asynchronous LimeSurvey API Client for Remote API 2.
+        :param url:     Fully-qualified LimeSurvey server URL containing protocol,
+                        hostname, port, and the endpoint for the Remote Control 2 API.
+        :param username: LimeSurvey account username
+        :param password: LimeSurvey account password
+        :param headers: Headers to include when making requests
+        :param timeout: (optional) Seconds to wait for the server before giving up
+                        on a request. By default, requests wait indefinitely.
+        :param max_keepalive_connections: Number of idle connections kept open
+        """
+        super().__init__(url, username, password, headers=headers, timeout=timeout)
+        self.max_keepalive_connections = max_keepalive_connections
+        self.client = None
+        self._protocol = JSONRPCProtocol()
+        self._request_ids = itertools.count(1)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def authenticate(self):
+        """
+        Performs authentication actions
+        Opens the shared HTTP client (once) and acquires a session key
+        :return: None
+        """
+        logger.info("Authenticating AsyncLimeAPI client")
+        self._patch_rpc_protocol()
+        if self.client is None:
+            import httpx
+
+            # Connection-specific headers are forbidden in HTTP/2
+            headers = {
+                k: v for k, v in self.headers.items() if k.lower() != "connection"
+            }
+            self.client = httpx.AsyncClient(
+                http2=True,
+                headers=headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_keepalive_connections=self.max_keepalive_connections
+                ),
+            )
+        self.session_key = await self._call(
+            "get_session_key", username=self.username, password=self.password
+        )
+        if not self._validate_session_key():
+            raise Exception(
+                f"Failed to validate session key: url={self.url} "
+                f"session_key={self.session_key}"
+            )
+        self._authenticated = True
+        logger.info(f"Acquired session key: {self.session_key}")
+
+    async def close(self):
+        """Closes the shared HTTP client"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+        self._authenticated = False
+
+    async def list_surveys(self, username=None):
+        """
+        List the surveys belonging to a user
+        See `LimeAPI.list_surveys`
+        :param username: (optional) Limits the list to the surveys of this user
+        :return: array of survey dict items
+        """
+        async with self.request_ctx("list_surveys"):
+            return await self._call(
+                "list_surveys",
+                sSessionKey=self.session_key,
+                sUser=username or self.username,
+            )
+
+    async def list_questions(
+        self, survey_id: int, group_id: int = None, language: str = None
+    ):
+        """
+        Return the ids and info of (sub-)questions of a survey/group.
+        :param survey_id: the survey ID
+        :param group_id: (optional) A group ID that can be used for filtering results
+        :param language:
+        :return: list of questions
+        """
+        async with self.request_ctx("list_questions"):
+            return await self._call(
+                "list_questions",
+                sSessionKey=self.session_key,
+                iSurveyID=survey_id,
+                iGroupId=group_id,
+                sLanguage=language,
+            )
+
+    async def get_language_properties(self, survey_id: int):
+        """
+        Gets language properties
+        :param survey_id:
+        :return:
+        """
+        async with self.request_ctx("get_language_properties"):
+            return await self._call(
+                "get_language_properties",
+                sSessionKey=self.session_key,
+                iSurveyID=survey_id,
+                aSurveyLocaleSettings=None,
+                sLang=None,
+            )
+
+    async def get_survey_properties(self, survey_id: int):
+        """
+        Retrieves survey properties
+        :param survey_id: the survey ID to retrieve
+        :return: list
+        """
+        async with self.request_ctx("get_survey_properties"):
+            return await self._call(
+                "get_survey_properties",
+                sSessionKey=self.session_key,
+                iSurveyID=survey_id,
+                aSurveyLocaleSettings=None,
+                sLang=None,
+            )
+
+    async def get_summary(self, survey_id: int, stat_name: str = "all"):
+        """
+        Retrieves survey summary statistics (e.g. response counts)
+        :param survey_id: the survey ID
+        :param stat_name: name of the statistic to retrieve, or "all"
+        :return: dict of statistics
+        """
+        async with self.request_ctx("get_summary"):
+            return await self._call(
+                "get_summary",
+                sSessionKey=self.session_key,
+                iSurveyID=survey_id,
+                sStatName=stat_name,
+            )
+
+    async def get_survey_metadata(self, survey_id: int):
+        """
+        Retrieves survey properties, language properties and questions
+        The three requests are sent concurrently
+        :param survey_id: the survey ID
+        :return: (survey properties, language properties, questions) tuple
+        """
+        survey_props, language_props, questions = await asyncio.gather(
+            self.get_survey_properties(survey_id),
+            self.get_language_properties(survey_id),
+            self.list_questions(survey_id),
+        )
+        return survey_props, language_props, questions
+
+    async def export_responses(
+        self,
+        survey_id: int,
+        language_code: str = None,
+        completion_status: str = "all",
+        heading_type: str = "code",
+        response_type: str = "long",
+        from_response_id: int = None,
+        to_response_id: int = None,
+        fields=None,
+    ):
+        async with self.request_ctx("export_responses"):
+            result_b64 = await self._call(
+                "export_responses",
+                sSessionKey=self.session_key,
+                iSurveyID=survey_id,
+                sDocumentType="json",
+                sLanguageCode=language_code,
+                sCompletionStatus=completion_status,
+                sHeadingType=heading_type,
+                sResponseType=response_type,
+                iFromResponseID=from_response_id,
+                iToResponseID=to_response_id,
+                aFields=fields,
+            )
+            return self._decode_export(result_b64)
+
+    async def iter_response_windows(
+        self,
+        survey_id: int,
+        window=1000,
+        concurrency=8,
+        completion_status="all",
+        **kwargs,
+    ):
+        """
+        Exports responses in response ID windows, fetched concurrently
+        Up to `concurrency` windows are requested at the same time; a new window
+        is requested as soon as one finishes, while responses are still missing.
+        Rows are yielded in response ID order, so only the windows in flight are
+        held in memory.
+        Fetching stops once the number of responses reported by `get_summary`
+        has been received. Response IDs can have gaps (e.g. deleted responses),
+        so after `concurrency` consecutive empty windows, everything above the
+        last window is fetched with one open-ended window instead.
+        :param survey_id: the survey ID
+        :param window: number of response IDs covered by each request
+        :param concurrency: number of windows requested at the same time
+        :param completion_status: "complete", "incomplete" or "all"
+        :param kwargs: additional `export_responses` parameters
+        :return: async generator of response rows
+        """
+        summary = await self.get_summary(survey_id)
+        try:
+            total = int(summary[_summary_counts[completion_status]])
+        except (KeyError, TypeError, ValueError):
+            raise Exception(
+                f"Failed to read the number of {completion_status} responses "
+                f"from the summary of survey {survey_id}: {summary}"
+            )
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(from_response_id, to_response_id):
+            async with semaphore:
+                return await self.export_responses(
+                    survey_id,
+                    completion_status=completion_status,
+                    from_response_id=from_response_id,
+                    to_response_id=to_response_id,
+                    **kwargs,
+                )
+
+        # Windows are queued ahead of the semaphore so that a request can start
+        # as soon as another one finishes. Only as many windows are queued as
+        # the remaining responses would fill if their IDs had no gaps.
+        pending = collections.deque()
+        next_window = 0
+        received = 0
+        empty_windows = 0
+        try:
+            while received < total and empty_windows < concurrency:
+                remaining_windows = math.ceil((total - received) / window)
+                while len(pending) < min(2 * concurrency, remaining_windows):
+                    first = next_window * window + 1
+                    task = asyncio.ensure_future(fetch(first, first + window - 1))
+                    pending.append(task)
+                    next_window += 1
+                rows = await pending.popleft()
+                empty_windows = 0 if rows else empty_windows + 1
+                received += len(rows)
+                for row in rows:
+                    yield row
+
+            if received < total:
+                # Windows that were already requested may still hold responses
+                while pending:
+                    rows = await pending.popleft()
+                    received += len(rows)
+                    for row in rows:
+                        yield row
+
+            if received < total:
+                first = next_window * window + 1
+                logger.info(
+                    f"[{survey_id}] Received {received}/{total} responses; "
+                    f"fetching responses from ID {first} onwards"
+                )
+                for row in await fetch(first, None):
+                    yield row
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def batch_call(self, specs):
+        """
+        Sends several independent RPC calls concurrently
+        :param specs: list of (method, kwargs) tuples
+        :return: list of results, in the same order as `specs`
+        """
+        async with self.request_ctx("batch"):
+            return await asyncio.gather(
+                *[
+                    self._call(method, sSessionKey=self.session_key, **kwargs)
+                    for method, kwargs in specs
+                ]
+            )
+
+    @asynccontextmanager
+    async def request_ctx(self, endpoint):
+        """
+        A common helper context that is used for all of the endpoints
+        It provides authentication, error handling, logging, and
+        stat collection
+        :param endpoint:
+        :return:
+        """
+        logger.info(f"Sending AsyncLimeAPI RPC Request for endpoint [{endpoint}]")
+        t0 = time.perf_counter()
+        try:
+            await self._validate_auth()
+            yield
+            duration = (time.perf_counter() - t0) * 1000.0
+            logger.info(f"Endpoint [{endpoint}]: Request completed in {duration} ms")
+            error = None
+        except Exception as e:
+            error = e
+            logger.opt(exception=e).debug(f"Endpoint [{endpoint}]: Request failed")
+
+        if error:
+            raise error
+
+    async def _call(self, method, **params):
+        """
+        Sends a single JSON-RPC request and returns its result
+        :param method: remote procedure name
+        :param params: named parameters of the remote procedure
+        :return: the `result` member of the reply
+        """
+        payload = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params,
+            "id": next(self._request_ids),
+        }
+        response = await self.client.post(self.remote_api_url, json=payload)
+        response.raise_for_status()
+        reply = self._protocol.parse_reply(response.content)
+        if isinstance(reply, JSONRPCErrorResponse):
+            raise RPCError(f"Error calling remote procedure: {reply.error}")
+        return reply.result
+
+    def _validate_rpc_resources(self):
+        return self.client is not None
+
+    async def _validate_auth(self):
+        """
+        Checks for authentication issues
+        :return: None
+        """
+        if (
+            not self._authenticated
+            or not self._validate_session_key()
+            or not self._validate_rpc_resources()
+        ):
+            await self.authenticate()
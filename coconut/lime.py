@@ -1,29 +1,66 @@
 import base64
 import json
-import traceback
+import time
 from contextlib import contextmanager
-from pprint import pprint
 
-import pendulum
+import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter
 from tinyrpc import InvalidReplyError
 from tinyrpc.client import RPCClient, RPCProxy
+from tinyrpc.exc import RPCError
 from tinyrpc.protocols.jsonrpc import (
+    JSONRPCBatchResponse,
     JSONRPCSuccessResponse,
     JSONRPCErrorResponse,
     JSONRPCProtocol,
 )
 from tinyrpc.transports.http import HttpPostClientTransport
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
-class LimeAPI:
+_allowed_reply_keys = frozenset(JSONRPCProtocol._ALLOWED_REPLY_KEYS)
+
+
+class KeepAliveHttpTransport(HttpPostClientTransport):
     """
-    LimeSurvey API Client for Remote API 2.
-        Aims to simplify and automate the necessary task of moving data out of
-        LimeSurvey without having to pull it directly from the site. Most of the
-        communication between the remote LimeSurvey instance and the API follows
-        the JSON-RPC 2 protocol.
-        request and response validation to help keep communication more consistent.
+    HTTP POST transport that reuses connections between requests.
+        The stock `HttpPostClientTransport` sends every message through
+        `requests.post`, which opens a new connection (and TLS handshake) per
+        call. This transport holds a single `requests.Session` with a pooled
+        adapter so that consecutive RPC calls share keep-alive connections.
+    """
+
+    def __init__(self, endpoint, pool_connections=10, pool_maxsize=20, **kwargs):
+        """
+        :param endpoint: The URL to send POST requests to
+        :param pool_connections: Number of connection pools to cache
+        :param pool_maxsize: Maximum number of connections to keep in each pool
+        :param kwargs: Additional keyword arguments passed along with each request,
+                       e.g. `headers` or `timeout`
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        super().__init__(endpoint, post_method=session.post, **kwargs)
+        self.session = session
+
+    def close(self):
+        """Closes the pooled connections held by the session"""
+        self.session.close()
+
+
+class BaseLimeAPI:
+    """
+    Settings, validation and reply handling shared by the LimeSurvey API clients
+        `LimeAPI` sends requests synchronously and `AsyncLimeAPI` sends them as
+        coroutines; the request-level behavior lives in those subclasses.
     """
 
     # The following defaults are defined in a configuration file. See `settings.py` for
@@ -33,11 +70,8 @@ class LimeAPI:
     # There are still a few pain points in dealing with the JSON-RPC protocol
     _rpc_protocol_patched = False
 
-    def __init__(self, url, username, password, headers=None):
+    def __init__(self, url, username, password, headers=None, timeout=None):
         """
-        LimeSurvey API Client for Remote API 2.
-        Aims to simplify and automate the necessary task of moving data out of
-        LimeSurvey in one way or another.
         :param url:     Fully-qualified LimeSurvey server URL containing protocol,
                         hostname, port, and the endpoint for the Remote Control 2 API.
         :param username: LimeSurvey account username
@@ -45,22 +79,184 @@ class LimeAPI:
         :param headers: Headers to include when making requests. At a minimum, each
                         request should be fitted with an application/JSON content-type
                         declaration
+        :param timeout: (optional) Seconds to wait for the server before giving up
+                        on a request. By default, requests wait indefinitely.
         """
-        logger.info("Instantiating LimeAPI client")
+        logger.info(f"Instantiating {type(self).__name__} client")
         self.url = url
         self.username = username
         self.password = password
         self.headers = self._default_headers if headers is None else headers
+        self.timeout = timeout
         self.session_key = None
-        self.rpc_client = None
-        self.rpc_proxy = None
         self._authenticated = False
 
         self._validate_settings()
+        self.remote_api_url = f"{self.url.rstrip('/')}/index.php/admin/remotecontrol"
+
+    @staticmethod
+    def _patch_rpc_protocol():
+        """Patches `tinyrpc`'s JSON-RPC protocol, once"""
+        if not BaseLimeAPI._rpc_protocol_patched:
+            BaseLimeAPI.patch_json_rpc_protocol()
+            BaseLimeAPI._rpc_protocol_patched = True
+
+    @staticmethod
+    def _decode_export(result_b64):
+        """
+        Decodes the base64-encoded JSON document returned by `export_responses`
+        :param result_b64: base64-encoded JSON export
+        :return: list of response rows
+        """
+        if isinstance(result_b64, dict):
+            # Empty exports are reported as a status message instead of a document
+            status = result_b64.get("status")
+            if status == "No Response found":
+                return []
+            raise Exception(f"Failed to export responses: {status}")
+        # The decoded bytes are parsed directly, without an intermediate str copy
+        responses = json_loads(base64.b64decode(result_b64))["responses"]
+        return [row for id_row_map in responses for row in id_row_map.values()]
+
+    @staticmethod
+    def patch_json_rpc_protocol():
+        def parse_reply_patched(self, data):
+            """Deserializes and validates a response.
+
+            Called by the client to reconstruct the serialized :py:class:`JSONRPCResponse`.
+
+            :param bytes data: The data stream received by the transport layer containing the
+                serialized request.
+            :return: A reconstructed response.
+            :rtype: :py:class:`JSONRPCSuccessResponse` or :py:class:`JSONRPCErrorResponse`
+            :raises InvalidReplyError: if the response is not valid JSON or does not conform
+                to the standard.
+            """
+            logger.opt(lazy=True).debug("Received RPC reply: {}", lambda: data[:500])
+            try:
+                rep = json_loads(data)
+            except Exception as e:
+                raise InvalidReplyError(e) from e
+            if isinstance(rep, list):
+                if not rep:
+                    raise InvalidReplyError("Empty batch response")
+                batch = JSONRPCBatchResponse()
+                batch.extend(parse_reply_item(self, r) for r in rep)
+                return batch
+            return parse_reply_item(self, rep)
+
+        def parse_reply_item(self, rep):
+            """Validates a single deserialized response object"""
+            if not isinstance(rep, dict):
+                raise InvalidReplyError("Response must be an object")
+            extra_keys = rep.keys() - _allowed_reply_keys
+            if extra_keys:
+                raise InvalidReplyError(f"Keys not allowed: {sorted(extra_keys)}")
+            if "id" not in rep:
+                raise InvalidReplyError("Missing id in response")
+            if "error" in rep and rep["error"] is not None:
+                # Callers raise (or handle, e.g. rejected batches) error replies
+                logger.debug("Received RPC error reply: {}", rep)
+                response = JSONRPCErrorResponse()
+                error = rep["error"]
+                if isinstance(error, str):
+                    response.error = error
+                    response.code = -1
+                    response._jsonrpc_error_code = -1
+                else:
+                    response.error = error["message"]
+                    response._jsonrpc_error_code = error["code"]
+                    if "data" in error:
+                        response.data = error["data"]
+            else:
+                response = JSONRPCSuccessResponse()
+                response.result = rep.get("result", None)
+            response.unique_id = rep["id"]
+            return response
+
+        logger.info("Patching JSONRPCProtocol `parse_reply` method")
+        JSONRPCProtocol.parse_reply = parse_reply_patched
+
+    def _validate_settings(self):
+        """
+        Makes sure that the we instantiated properly
+        :return:
+        """
+        logger.info("Validating LimeAPI settings")
+        if None in [self.url, self.username, self.password]:
+            raise EnvironmentError()
+
+    def _validate_session_key(self):
 
-    @property
-    def remote_api_url(self):
-        return "/".join([self.url.rstrip("/"), "/index.php/admin/remotecontrol"])
+        if self.session_key is None:
+            return False
+
+        if not isinstance(self.session_key, str):
+            return False
+
+        if type(self.session_key) is str and len(self.session_key) == 0:
+            return False
+
+        return True
+
+
+class LimeAPI(BaseLimeAPI):
+    """
+    LimeSurvey API Client for Remote API 2.
+        Aims to simplify and automate the necessary task of moving data out of
+        LimeSurvey without having to pull it directly from the site. Most of the
+        communication between the remote LimeSurvey instance and the API follows
+        the JSON-RPC 2 protocol.
+        request and response validation to help keep communication more consistent.
+    """
+
+    # Large batches are serialized by the server into a single (slow) reply
+    _max_batch_size = 25
+
+    def __init__(
+        self, url, username, password, headers=None, timeout=None, batch_requests=False
+    ):
+        """
+        LimeSurvey API Client for Remote API 2.
+        Aims to simplify and automate the necessary task of moving data out of
+        LimeSurvey in one way or another.
+        :param url:     Fully-qualified LimeSurvey server URL containing protocol,
+                        hostname, port, and the endpoint for the Remote Control 2 API.
+        :param username: LimeSurvey account username
+        :param password: LimeSurvey account password
+        :param headers: Headers to include when making requests. At a minimum, each
+                        request should be fitted with an application/JSON content-type
+                        declaration
+        :param timeout: (optional) Seconds to wait for the server before giving up
+                        on a request. By default, requests wait indefinitely.
+        :param batch_requests: (optional) Send `batch_call` calls as JSON-RPC 2.0
+                        batch requests. Only useful with servers (or proxies) that
+                        support batches; LimeSurvey's own server does not.
+        """
+        super().__init__(url, username, password, headers=headers, timeout=timeout)
+        self.batch_requests = batch_requests
+        self.transport = None
+        self.rpc_client = None
+        self.rpc_proxy = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Releases the pooled connections held by the transport
+        The client re-authenticates (with a new transport) if it is used again.
+        :return: None
+        """
+        if self.transport is not None:
+            self.transport.close()
+        self.transport = None
+        self.rpc_client = None
+        self.rpc_proxy = None
+        self._authenticated = False
 
     def authenticate(self):
         """
@@ -72,13 +268,13 @@ class LimeAPI:
         :return: None
         """
         logger.info("Authenticating LimeAPI client")
-        if not LimeAPI._rpc_protocol_patched:
-            LimeAPI.patch_json_rpc_protocol()
-            LimeAPI._rpc_protocol_patched = True
-        self.rpc_client = RPCClient(
-            JSONRPCProtocol(),
-            HttpPostClientTransport(endpoint=self.remote_api_url, headers=self.headers),
-        )
+        self._patch_rpc_protocol()
+        if self.transport is None:
+            # The transport outlives re-authentication so pooled connections are kept
+            self.transport = KeepAliveHttpTransport(
+                endpoint=self.remote_api_url, headers=self.headers, timeout=self.timeout
+            )
+        self.rpc_client = RPCClient(JSONRPCProtocol(), self.transport)
 
         self.rpc_proxy = self.rpc_client.get_proxy()
         self.session_key = self.rpc_proxy.get_session_key(
@@ -164,6 +360,123 @@ class LimeAPI:
             )
             return result
 
+    def get_summary(self, survey_id: int, stat_name: str = "all"):
+        """
+        Retrieves survey summary statistics (e.g. response counts)
+        :param survey_id: the survey ID
+        :param stat_name: name of the statistic to retrieve, or "all"
+        :return: dict of statistics
+        """
+        with self.request_ctx("get_summary"):
+            result = self.rpc_proxy.get_summary(
+                sSessionKey=self.session_key, iSurveyID=survey_id, sStatName=stat_name
+            )
+            return result
+
+    def get_survey_metadata(self, survey_id: int):
+        """
+        Retrieves survey properties, language properties and questions
+        The three calls are independent, so they are sent as a single batch
+        request when batching is enabled, and one at a time otherwise
+        :param survey_id: the survey ID
+        :return: (survey properties, language properties, questions) tuple
+        """
+        properties = dict(iSurveyID=survey_id, aSurveyLocaleSettings=None, sLang=None)
+        survey_props, language_props, questions = self.batch_call(
+            [
+                ("get_survey_properties", properties),
+                ("get_language_properties", properties),
+                (
+                    "list_questions",
+                    {"iSurveyID": survey_id, "iGroupId": None, "sLanguage": None},
+                ),
+            ]
+        )
+        return survey_props, language_props, questions
+
+    def batch_call(self, specs):
+        """
+        Sends several independent RPC calls, batched when enabled
+        With `batch_requests` enabled, calls are packed into JSON-RPC 2.0 batch
+        requests of at most `_max_batch_size` calls, so N calls cost one round
+        trip instead of N. LimeSurvey's own server only accepts single requests,
+        so if a batch is not answered with a batch reply, batching is disabled
+        for this client and the calls are sent one at a time.
+        The session key is added to the parameters of each call.
+        :param specs: list of (method, kwargs) tuples
+        :return: list of results, in the same order as `specs`
+        """
+        results = []
+        for i in range(0, len(specs), self._max_batch_size):
+            chunk = specs[i : i + self._max_batch_size]
+            batch_results = self._send_batch(chunk) if self.batch_requests else None
+            if batch_results is None:
+                batch_results = [self._call(method, **kw) for method, kw in chunk]
+            results.extend(batch_results)
+        return results
+
+    def _send_batch(self, specs):
+        """
+        Sends calls as a single JSON-RPC 2.0 batch request
+        :param specs: list of (method, kwargs) tuples
+        :return: list of results, or None if the server doesn't support batches
+        """
+        with self.request_ctx("batch"):
+            protocol = self.rpc_client.protocol
+            batch = protocol.create_batch_request()
+            for method, kwargs in specs:
+                batch.append(
+                    protocol.create_request(
+                        method, kwargs=dict(sSessionKey=self.session_key, **kwargs)
+                    )
+                )
+            reply = self.rpc_client.transport.send_message(batch.serialize())
+            try:
+                responses = protocol.parse_reply(reply)
+            except InvalidReplyError as e:
+                responses = e
+            if not isinstance(responses, JSONRPCBatchResponse):
+                reason = getattr(responses, "error", responses)
+                logger.warning(
+                    f"Batch request not supported by the server ({reason}); "
+                    f"sending calls one at a time"
+                )
+                self.batch_requests = False
+                return None
+
+            responses_by_id = {r.unique_id: r for r in responses}
+            results = []
+            for request in batch:
+                response = responses_by_id.get(request.unique_id)
+                if response is None:
+                    # Errors about the batch as a whole can't reference a request id
+                    errors = [
+                        r.error
+                        for r in responses
+                        if isinstance(r, JSONRPCErrorResponse)
+                    ]
+                    if errors:
+                        raise RPCError(f"Error calling remote procedure: {errors[0]}")
+                    raise InvalidReplyError(
+                        f"Missing response for batched call: {request.method}"
+                    )
+                if isinstance(response, JSONRPCErrorResponse):
+                    raise RPCError(f"Error calling remote procedure: {response.error}")
+                results.append(response.result)
+            return results
+
+    def _call(self, method, **kwargs):
+        """
+        Sends a single RPC call, adding the session key to its parameters
+        :param method: remote procedure name
+        :param kwargs: named parameters of the remote procedure
+        :return: the call result
+        """
+        with self.request_ctx(method):
+            return getattr(self.rpc_proxy, method)(
+                sSessionKey=self.session_key, **kwargs
+            )
+
     @contextmanager
     def request_ctx(self, endpoint):
         """
@@ -175,16 +488,16 @@ class LimeAPI:
         :return:
         """
         logger.info(f"Sending LimeAPI RPC Request for endpoint [{endpoint}]")
-        t0 = pendulum.now()
+        t0 = time.perf_counter()
         try:
             self._validate_auth()
             yield
-            duration = (pendulum.now() - t0).total_seconds() * 1000
+            duration = (time.perf_counter() - t0) * 1000.0
             logger.info(f"Endpoint [{endpoint}]: Request completed in {duration} ms")
             error = None
         except Exception as e:
             error = e
-            traceback.print_exc()
+            logger.opt(exception=e).debug(f"Endpoint [{endpoint}]: Request failed")
 
         if error:
             raise error
@@ -217,72 +530,7 @@ class LimeAPI:
                 iToResponseID=to_response_id,
                 aFields=fields,
             )
-            result_utf8 = base64.b64decode(result_b64).decode("utf-8")
-            result_json = json.loads(result_utf8)
-            result_json = result_json["responses"]
-            rows = []
-            for id_survey_map in result_json:
-                for survey in id_survey_map.values():
-                    rows.append(survey)
-            return rows
-
-    @staticmethod
-    def patch_json_rpc_protocol():
-        def parse_reply_patched(self, data):
-            """Deserializes and validates a response.
-
-            Called by the client to reconstruct the serialized :py:class:`JSONRPCResponse`.
-
-            :param bytes data: The data stream received by the transport layer containing the
-                serialized request.
-            :return: A reconstructed response.
-            :rtype: :py:class:`JSONRPCSuccessResponse` or :py:class:`JSONRPCErrorResponse`
-            :raises InvalidReplyError: if the response is not valid JSON or does not conform
-                to the standard.
-            """
-            if isinstance(data, bytes):
-                data = data.decode()
-            try:
-                print(data)
-                rep = json.loads(data)
-            except Exception as e:
-                traceback.print_exc()
-                raise InvalidReplyError(e)
-            for k in rep.keys():
-                if not k in self._ALLOWED_REPLY_KEYS:
-                    raise InvalidReplyError("Key not allowed: %s" % k)
-            if "id" not in rep:
-                raise InvalidReplyError("Missing id in response")
-            if "error" in rep and rep["error"] is not None:
-                pprint(rep)
-                response = JSONRPCErrorResponse()
-                error = rep["error"]
-                if isinstance(error, str):
-                    response.error = error
-                    response.code = -1
-                    response._jsonrpc_error_code = -1
-                else:
-                    response.error = error["message"]
-                    response._jsonrpc_error_code = error["code"]
-                    if "data" in error:
-                        response.data = error["data"]
-            else:
-                response = JSONRPCSuccessResponse()
-                response.result = rep.get("result", None)
-            response.unique_id = rep["id"]
-            return response
-
-        logger.info("Patching JSONRPCProtocol `parse_reply` method")
-        JSONRPCProtocol.parse_reply = parse_reply_patched
-
-    def _validate_settings(self):
-        """
-        Makes sure that the we instantiated properly
-        :return:
-        """
-        logger.info("Validating LimeAPI settings")
-        if None in [self.url, self.username, self.password]:
-            raise EnvironmentError()
+            return self._decode_export(result_b64)
 
     def _validate_rpc_resources(self):
 
@@ -294,19 +542,6 @@ class LimeAPI:
 
         return True
 
-    def _validate_session_key(self):
-
-        if self.session_key is None:
-            return False
-
-        if not isinstance(self.session_key, str):
-            return False
-
-        if type(self.session_key) is str and len(self.session_key) == 0:
-            return False
-
-        return True
-
     def _validate_auth(self):
         """
         Checks for authentication issues
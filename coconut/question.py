@@ -1,14 +1,22 @@
 import re
+from functools import cached_property
+
+_whitespace_re = re.compile(r"[\n\t\r]+")
+_tag_re = re.compile(r"<[^>]*>")
+_spaces_re = re.compile(r" {2,}")
 
 
 class Question:
     """Represents a survey question"""
     _columns = ("qid", "sid", "gid", "type", "title", "text")
+    _dtypes = {"qid": "int32", "sid": "int32", "gid": "int32"}
 
     def __init__(self, data):
         self.data = data
+        self.question_id = int(data["id"]["qid"])
         self.parent = None
         self.children = {}
+        self._full_title = None
 
     def __str__(self):
         return f'Question(id={self.question_id}, title={self.title})'
@@ -16,6 +24,7 @@ class Question:
     def link_child(self, child: 'Question'):
         self.children[child.question_id] = child
         child.parent = self
+        child._full_title = f"{self._title}[{child._title}]"
 
     def link_parent(self, parent: 'Question'):
         self.parent = parent
@@ -31,35 +40,30 @@ class Question:
 
     @property
     def title(self):
-        if self.is_child:
-            return f"{self.parent._title}[{self._title}]"
-        return self._title
+        # Child titles are built once, when the parent is linked
+        return self._full_title or self._title
 
-    @property
+    @cached_property
     def _title(self):
         return self.data["title"]
 
-    @property
+    @cached_property
     def type(self):
         return self.data["type"]
 
-    @property
+    @cached_property
     def text(self):
         return clean_question_text(self.data["question"])
 
-    @property
+    @cached_property
     def survey_id(self):
         return int(self.data["sid"])
 
-    @property
+    @cached_property
     def group_id(self):
         return int(self.data["gid"])
 
-    @property
-    def question_id(self):
-        return int(self.data["id"]["qid"])
-
-    @property
+    @cached_property
     def parent_qid(self):
         return int(self.data["parent_qid"])
 
@@ -79,6 +83,7 @@ class QuestionGroup:
     _columns = ("key", "question", "options")
     def __init__(self, parent):
         self.parent = parent
+        self._other_title = f"{parent.title}[other]"
 
     def __str__(self):
         return f"QuestionGroup({self.key})"
@@ -126,7 +131,7 @@ class QuestionGroup:
 
     def get_other_value(self, response):
         try:
-            value = response.get_answer(self.parent.title + "[other]")
+            value = response.get_answer(self._other_title)
             if value == "None":
                 return None
             return value
@@ -135,8 +140,5 @@ class QuestionGroup:
 
 
 def clean_question_text(text):
-    t = text
-    t = re.sub(r"[\n\t\r]", " ", t)
-    t = re.sub(r"<.*>", " ", t)
-    t = re.sub(r" +", " ", t)
-    return t
+    """Replaces line breaks, tabs and HTML tags with single spaces"""
+    return _spaces_re.sub(" ", _tag_re.sub(" ", _whitespace_re.sub(" ", text)))
@@ -1,13 +1,20 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
 import os
 
-import pandas as pd
 from loguru import logger
 
+from coconut.async_lime import AsyncLimeAPI
 from coconut.lime import LimeAPI
 from coconut.question import Question, QuestionGroup
 from coconut.response import Response
-from coconut.utils import get_col_widths, classproperty, dump_yaml
-from typing import List, Tuple
+from coconut.utils import get_col_widths, classproperty, dump_yaml, to_excel_value
+from typing import TYPE_CHECKING, List, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class Survey:
@@ -21,10 +28,17 @@ class Survey:
         """
         return Response
 
-    def __init__(self, survey_id, lime_api: LimeAPI, workbook_id=None, title=None):
+    def __init__(
+        self,
+        survey_id,
+        lime_api: Union[LimeAPI, AsyncLimeAPI],
+        workbook_id=None,
+        title=None,
+    ):
         """Instantiates a Survey instance
         :param survey_id: LimeSurvey survey ID
-        :param lime_api: LimeSurvey API instance
+        :param lime_api: LimeSurvey API instance. An `AsyncLimeAPI` client can
+                         only load data with `load_data_async`
         """
         self._title = title
         self.survey_id = survey_id
@@ -33,16 +47,16 @@ class Survey:
         self.questions_by_id = None
         self.questions_by_title = None
         self.question_groups_by_key = None
-        self.responses_by_id = None
+        self.responses_df = None
         self.language_props = None
         self.survey_props = None
 
     def __len__(self):
         """Number of responses available for this survey"""
         assert (
-            self.responses_by_id is not None
+            self.responses_df is not None
         ), "Unable to determine survey size. Responses have not been loaded."
-        return len(self.responses_by_id)
+        return len(self.responses_df)
 
     @property
     def id(self):
@@ -77,12 +91,37 @@ class Survey:
 
     def load_data(self):
         """Loads data from LimeSurvey"""
+        if isinstance(self.lime_api, AsyncLimeAPI):
+            raise TypeError(
+                "Survey.load_data needs a LimeAPI client; "
+                "use 'await survey.load_data_async()' with an AsyncLimeAPI client"
+            )
         logger.info(f"[{self.id}] Loading data")
         self._initialize_api()
-        self._load_survey_props()
-        self._load_language_props()
-        self._load_questions()
-        self._load_responses()
+        self._load_survey_metadata()
+        self._load_responses(self.lime_api.export_responses(self.survey_id))
+
+    async def load_data_async(self):
+        """Loads data from LimeSurvey using an `AsyncLimeAPI` client
+        The survey props, language props and questions are requested
+        concurrently while responses are streamed in ID windows.
+        """
+        if not isinstance(self.lime_api, AsyncLimeAPI):
+            raise TypeError(
+                "Survey.load_data_async needs an AsyncLimeAPI client; "
+                "use 'survey.load_data()' with a LimeAPI client"
+            )
+        logger.info(f"[{self.id}] Loading data")
+        logger.info(f"[{self.id}] Authenticating Lime API Client")
+        await self.lime_api.authenticate()
+        metadata, _ = await asyncio.gather(
+            self.lime_api.get_survey_metadata(self.id),
+            self._load_responses_async(
+                self.lime_api.iter_response_windows(self.survey_id)
+            ),
+        )
+        self.survey_props, self.language_props, questions = metadata
+        self._load_questions(questions)
 
     def to_excel(self, filepath):
         """Saves data"""
@@ -98,54 +137,63 @@ class Survey:
         logger.info(f"[{self.id}] Authenticating Lime API Client")
         self.lime_api.authenticate()
 
-    def _load_language_props(self):
-        """Loads language properties from LimeSurvey"""
-        logger.info(f"[{self.id}] Loading language props")
-        self.language_properties = self.lime_api.get_language_properties(self.id)
+    def _load_survey_metadata(self):
+        """Loads survey props, language props and questions from LimeSurvey"""
+        logger.info(f"[{self.id}] Loading survey props, language props and questions")
+        metadata = self.lime_api.get_survey_metadata(self.id)
+        self.survey_props, self.language_props, questions = metadata
+        self._load_questions(questions)
 
-    def _load_survey_props(self):
-        """Loads survey properties from LimeSurvey"""
-        logger.info(f"[{self.id}] Loading survey props")
-        self.survey_props = self.lime_api.get_survey_properties(self.id)
+    def _load_responses(self, rows):
+        """Loads response data
+        :param rows: response rows returned by LimeSurvey's `export_responses`
+        """
+        logger.info(f"[{self.id}] Loading responses")
+        self._set_responses(self.response_cls(r).dict() for r in rows)
 
-    def _load_responses(self):
-        """Loads response data from LimeSurvey"""
+    async def _load_responses_async(self, rows):
+        """Loads response data from an async iterator
+        :param rows: response rows, e.g. from `AsyncLimeAPI.iter_response_windows`
+        """
         logger.info(f"[{self.id}] Loading responses")
-        self.responses_by_id = {}
-        for r in self.lime_api.export_responses(self.survey_id):
-            response = self.response_cls(r)
-            self.responses_by_id[response.id] = response
+        self._set_responses([self.response_cls(r).dict() async for r in rows])
+
+    def _set_responses(self, records):
+        """Builds the response dataframe, sorted by response ID
+        :param records: iterable of response dicts
+        """
+        import pandas as pd
 
-    def _load_questions(self):
-        """Loads survey question information from LimeSurvey"""
+        dataframe = pd.DataFrame.from_records(records)
+        if "id" in dataframe.columns:
+            dataframe = dataframe.astype({"id": "int64"})
+            dataframe.sort_values("id", ignore_index=True, inplace=True)
+        self.responses_df = dataframe
+
+    def _load_questions(self, questions):
+        """Loads survey question information
+        :param questions: question list returned by LimeSurvey's `list_questions`
+        """
         logger.info(f"[{self.id}] Loading questions")
         self.questions_by_id = {}
-        for q in self.lime_api.list_questions(self.id):
+        children = []
+        for q in questions:
             question = Question(q)
             self.questions_by_id[question.question_id] = question
-        self._process_question_relationships()
-        self._create_question_title_mapping()
+            if question.parent_qid:
+                children.append(question)
 
-    def _process_question_relationships(self):
-        """Creates parent-child relationships between related questions
-        Allows us to link questions directly to response items via question title
-        """
+        # Children may be listed before their parents, so they are linked once
+        # every question has been indexed
         self.question_groups_by_key = {}
-        for q in self.questions_by_id.values():
-            if q.parent_qid in self.questions_by_id:
-                parent = self.questions_by_id[q.parent_qid]
+        for q in children:
+            parent = self.questions_by_id.get(q.parent_qid)
+            if parent is not None:
                 self._create_question_link(parent, q)
                 self._create_question_group(parent)
 
-    def _create_question_title_mapping(self):
-        """Maps question title to question objects
-        Requires question relationships to be processed beforehand, because
-        title is dependent on whether or not the question has a parent, indicating
-        it's part of another question.
-        """
-        self.questions_by_title = {}
-        for q in self.questions_by_id.values():
-            self.questions_by_title[q.title] = q
+        # Titles depend on the parent links, so they are mapped last
+        self.questions_by_title = {q.title: q for q in self.questions_by_id.values()}
 
     def _create_question_link(self, parent, child):
         """Creates a link between parent-child question pairs"""
@@ -155,46 +203,83 @@ class Survey:
         """Creates a question group if one doesn't exist for the question
         :param q: a question with child nodes
         """
-        if q.title not in self.question_groups_by_key:
-            logger.info(f"Creating question group: {q.title}")
-            group = QuestionGroup(parent=q)
-            self.question_groups_by_key[group.key] = group
+        key = q.title
+        if self.question_groups_by_key.get(key) is None:
+            logger.info(f"Creating question group: {key}")
+            self.question_groups_by_key[key] = QuestionGroup(parent=q)
 
     def _question_dataframe(self):
         """Creates a dataframe containing information about each survey question"""
+        import pandas as pd
+
         questions = list(self.questions_by_title.values())
         questions = sorted(questions, key=lambda x: x.title)
         questions = [q.dict() for q in questions]
-        return pd.DataFrame(questions, columns=Question._columns)
+        dataframe = pd.DataFrame.from_records(questions, columns=Question._columns)
+        return dataframe.astype(Question._dtypes)
 
     def _question_group_dataframe(self):
         """Creates a dataframe containing information about each survey question"""
+        import pandas as pd
+
         question_groups = list(self.question_groups_by_key.values())
         question_groups = sorted(question_groups, key=lambda x: x.key)
         question_groups = [qg.dict(flattened=True) for qg in question_groups]
-        return pd.DataFrame(question_groups, columns=QuestionGroup._columns)
+        return pd.DataFrame.from_records(
+            question_groups, columns=QuestionGroup._columns
+        )
 
     def _response_dataframe(self):
-        """Creates a dataframe containing information about each survey question"""
-        responses = list(self.responses_by_id.values())
-        responses = sorted(responses, key=lambda x: x.id)
-        responses = [r.dict() for r in responses]
-        return pd.DataFrame(responses)
+        """Returns a copy of the dataframe containing each survey response
+        The loaded responses can't be changed through the returned dataframe
+        """
+        return self.responses_df.copy()
 
     def _save_workbook(self, filepath):
+        import xlsxwriter
+
         logger.info(f"[{self.id}] Saving workbook to {filepath}")
-        writer = pd.ExcelWriter(filepath, engine="xlsxwriter")
+        # In constant memory mode, each row is flushed to disk as soon as a later
+        # row is written, which keeps memory usage independent of the row count
+        workbook = xlsxwriter.Workbook(
+            filepath, {"constant_memory": True, "strings_to_urls": False}
+        )
         for sheet_name, data in self.worksheets:
-            self._add_worksheet(writer, data, sheet_name)
-        writer.save()
+            self._add_worksheet(workbook, data, sheet_name)
+        workbook.close()
         logger.success(f"[{self.id}] Workbook saved to {filepath}")
 
-    def _add_worksheet(self, writer, dataframe, sheet_name):
+    def _add_worksheet(self, workbook, dataframe, sheet_name):
+        """Writes a dataframe (with its index) to a new worksheet
+        Cells are written row by row, as required by constant memory mode.
+        `DataFrame.to_excel` writes column by column, so it can't be used here.
+        """
         logger.info(f"[{self.id}] Adding worksheet: {sheet_name}")
-        dataframe.to_excel(writer, sheet_name=sheet_name)
+        worksheet = workbook.add_worksheet(sheet_name)
+        header_format = workbook.add_format({"bold": True, "border": 1})
         for i, width in enumerate(get_col_widths(dataframe)):
-            writer.sheets[sheet_name].set_column(i, i, min(30, width * 1.25))
-
+            worksheet.set_column(i, i, min(30, width * 1.25))
+
+        # The same date formats as `DataFrame.to_excel`
+        datetime_format = workbook.add_format({"num_format": "YYYY-MM-DD HH:MM:SS"})
+        date_format = workbook.add_format({"num_format": "YYYY-MM-DD"})
+
+        def cell_format(value):
+            if isinstance(value, datetime.datetime):
+                return datetime_format
+            if isinstance(value, datetime.date):
+                return date_format
+            return None
+
+        worksheet.write(0, 0, to_excel_value(dataframe.index.name), header_format)
+        worksheet.write_row(
+            0, 1, [to_excel_value(c) for c in dataframe.columns], header_format
+        )
+        for row, (index, *record) in enumerate(dataframe.itertuples(name=None), 1):
+            worksheet.write(row, 0, to_excel_value(index), header_format)
+            for col, value in enumerate(record, start=1):
+                value = to_excel_value(value)
+                worksheet.write(row, col, value, cell_format(value))
 
     @property
     def basename(self):
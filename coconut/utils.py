@@ -1,3 +1,7 @@
+import datetime
+import decimal
+import math
+import numbers
 
 
 def dump_yaml(data, filepath):
@@ -16,16 +20,53 @@ def get_col_widths(dataframe):
     Used for Excel exports
     :param dataframe: The data frame to inspect
     """
-    idx_max = max(
-        [len(str(s)) for s in dataframe.index.values] + [len(str(dataframe.index.name))]
-    )
+    idx_max = max(_max_str_len(dataframe.index), len(str(dataframe.index.name)))
     res = [idx_max] + [
-        max([len(str(s)) for s in dataframe[col].values] + [len(col)])
-        for col in dataframe.columns
+        max(_max_str_len(values), len(col)) for col, values in dataframe.items()
     ]
     return res
 
 
+def to_excel_value(value):
+    """Converts a cell value to one that xlsxwriter can write
+    Mirrors what `DataFrame.to_excel` does: missing values (None, NaN, NaT, NA)
+    become blank cells, infinities and non-scalar cells (e.g. lists) are written
+    as strings.
+    :param value: The cell value
+    """
+    import pandas as pd
+
+    if hasattr(value, "item") and hasattr(value, "dtype"):
+        # NumPy scalar
+        value = value.item()
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, (float, decimal.Decimal)):
+        if math.isnan(value):
+            return None
+        if math.isinf(value):
+            return "-inf" if value < 0 else "inf"
+        return value
+    scalar_types = (
+        str,
+        numbers.Real,
+        datetime.date,
+        datetime.timedelta,
+    )
+    if isinstance(value, scalar_types):
+        return value
+    return str(value)
+
+
+def _max_str_len(values):
+    """Gets the length of the longest string representation in a series or index
+    :param values: The series or index to inspect
+    """
+    width = values.astype(str).str.len().max()
+    # Empty (or all-missing) values have no maximum
+    return 0 if width != width else int(width)
+
+
 def classproperty(func):
     if not isinstance(func, (classmethod, staticmethod)):
         func = classmethod(func)
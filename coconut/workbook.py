@@ -1,5 +1,5 @@
-from google.oauth2 import service_account
-from gspread_pandas import Spread, Client
+from functools import cached_property
+
 from loguru import logger
 
 
@@ -18,12 +18,14 @@ class Workbook:
         self.survey = survey
         self.service_account_json_path = service_account_json_path
 
-    @property
+    @cached_property
     def credentials(self):
         """Loads Google service account credentials from a JSON file
         :param google_credentials_json_path: Path to the service account credentials
         :return: A google.oauth2.service_account.Credentials instance
         """
+        from google.oauth2 import service_account
+
         credentials = service_account.Credentials.from_service_account_file(
             self.service_account_json_path,
             scopes=[
@@ -34,11 +36,21 @@ class Workbook:
         )
         return credentials
 
+    @cached_property
+    def client(self):
+        """Google Sheets client, reused across `sync` calls
+        :return: A gspread_pandas.Client instance
+        """
+        from gspread_pandas import Client
+
+        return Client(creds=self.credentials)
+
     def sync(self):
+        from gspread_pandas import Spread
+
         logger.info(f"Synchronizing Workbook: {self.workbook_id}")
 
-        client = Client(creds=self.credentials)
-        spread = Spread(self.workbook_id, create_sheet=True, client=client)
+        spread = Spread(self.workbook_id, create_sheet=True, client=self.client)
 
         for sheet_name, data in self.survey.worksheets:
             logger.info(f"Updating Google Sheet: {sheet_name}")
@@ -20,12 +20,11 @@ setuptools.setup(
     url="https://github.com/istresearch/coconut",
     packages=["coconut"],
     classifiers=[
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
+    python_requires=">=3.8",
     install_requires=[requirements],
     include_package_data=True,
 )
@@ -0,0 +1,122 @@
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+QUESTIONS = [
+    {
+        "id": {"qid": 11},
+        "title": "SQ001",
+        "parent_qid": 10,
+        "sid": 1,
+        "gid": 2,
+        "type": "M",
+        "question": "Red",
+    },
+    {
+        "id": {"qid": 10},
+        "title": "Q1",
+        "parent_qid": 0,
+        "sid": 1,
+        "gid": 2,
+        "type": "M",
+        "question": "<p>Favorite colors?</p>",
+    },
+]
+
+
+class FakeLimeServer:
+    """A local HTTP server that answers RPC calls like LimeSurvey's remotecontrol
+    Like LimeSurvey, it only accepts single request objects and reports errors
+    as strings. Set `batch_replies` to answer batch requests instead.
+    """
+
+    def __init__(self):
+        self.ids = list(range(1, 11))
+        self.summary = None
+        self.batch_replies = False
+        self.calls = []
+        self.requests = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_cls())
+        self.url = f"http://127.0.0.1:{self._server.server_port}/"
+
+    def start(self):
+        threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def exports(self):
+        """Returns the (from, to) response ID windows that were exported"""
+        return [
+            (params["iFromResponseID"], params["iToResponseID"])
+            for method, params in self.calls
+            if method == "export_responses"
+        ]
+
+    def reply(self, request):
+        if isinstance(request, list):
+            if not self.batch_replies:
+                return {"id": None, "result": None, "error": "Invalid request"}
+            return [self.reply(r) for r in request]
+        method, params = request["method"], request["params"]
+        self.calls.append((method, params))
+        if method == "export_responses":
+            result = self.export(params)
+        else:
+            result = {
+                "get_session_key": "abc123",
+                "get_survey_properties": {"sid": 1},
+                "get_language_properties": {"surveyls_title": "Colors"},
+                "list_questions": QUESTIONS,
+                "get_summary": self.summary or {"full_responses": str(len(self.ids))},
+            }.get(method)
+        if result is None:
+            return {"id": request["id"], "result": None, "error": "Unknown method"}
+        return {"id": request["id"], "result": result, "error": None}
+
+    def export(self, params):
+        first, last = params["iFromResponseID"], params["iToResponseID"]
+        ids = [
+            i
+            for i in self.ids
+            if (first is None or i >= first) and (last is None or i <= last)
+        ]
+        if not ids:
+            return {"status": "No Response found"}
+        document = {"responses": [{str(i): {"id": str(i)}} for i in ids]}
+        return base64.b64encode(json.dumps(document).encode()).decode()
+
+    def _handler_cls(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers["content-length"])
+                request = json.loads(self.rfile.read(length))
+                server.requests.append(request)
+                body = json.dumps(server.reply(request)).encode()
+                self.send_response(200)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+@pytest.fixture
+def lime_server():
+    server = FakeLimeServer()
+    server.start()
+    yield server
+    server.stop()
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from coconut import AsyncLimeAPI, LimeAPI, Survey
+
+
+def export_ids(lime_server, **kwargs):
+    async def export():
+        async with AsyncLimeAPI(lime_server.url, "user", "secret") as lime:
+            return [
+                int(row["id"]) async for row in lime.iter_response_windows(1, **kwargs)
+            ]
+
+    return asyncio.run(export())
+
+
+def test_iter_response_windows_requests_a_single_window_for_small_surveys(
+    lime_server,
+):
+    assert export_ids(lime_server) == list(range(1, 11))
+    assert lime_server.exports() == [(1, 1000)]
+
+
+def test_iter_response_windows_requests_only_the_windows_needed(lime_server):
+    lime_server.ids = list(range(1, 2501))
+    assert export_ids(lime_server, window=1000) == lime_server.ids
+    assert lime_server.exports() == [(1, 1000), (1001, 2000), (2001, 3000)]
+
+
+def test_iter_response_windows_skips_gaps_in_response_ids(lime_server):
+    lime_server.ids = list(range(1, 11)) + list(range(20000, 20010))
+    assert export_ids(lime_server, window=1000, concurrency=4) == lime_server.ids
+    # Consecutive empty windows end the scan with an open-ended window
+    assert lime_server.exports() == [
+        (1, 1000),
+        (1001, 2000),
+        (2001, 3000),
+        (3001, 4000),
+        (4001, 5000),
+        (5001, None),
+    ]
+
+
+def test_iter_response_windows_raises_on_a_status_summary(lime_server):
+    lime_server.summary = {"status": "No permission"}
+    with pytest.raises(Exception, match="No permission"):
+        export_ids(lime_server)
+    assert lime_server.exports() == []
+
+
+def test_iter_response_windows_cancels_pending_windows_when_closed(lime_server):
+    lime_server.ids = list(range(1, 2501))
+
+    async def export_first_row():
+        async with AsyncLimeAPI(lime_server.url, "user", "secret") as lime:
+            rows = lime.iter_response_windows(1, window=100, concurrency=2)
+            first = await rows.__anext__()
+            await rows.aclose()
+            current = asyncio.current_task()
+            return first, [t for t in asyncio.all_tasks() if t is not current]
+
+    first, pending = asyncio.run(export_first_row())
+    assert first["id"] == "1"
+    assert pending == []
+    assert len(lime_server.exports()) <= 4
+
+
+def test_survey_loads_data_with_an_async_client(lime_server):
+    pytest.importorskip("pandas")
+
+    async def load():
+        async with AsyncLimeAPI(lime_server.url, "user", "secret") as lime:
+            survey = Survey(1, lime)
+            await survey.load_data_async()
+            return survey
+
+    survey = asyncio.run(load())
+    assert list(survey.dataframe["id"]) == list(range(1, 11))
+    assert survey.language_props == {"surveyls_title": "Colors"}
+    assert sorted(survey.questions_by_title) == ["Q1", "Q1[SQ001]"]
+
+
+def test_survey_rejects_mismatched_clients(lime_server):
+    survey = Survey(1, AsyncLimeAPI(lime_server.url, "user", "secret"))
+    with pytest.raises(TypeError, match="load_data_async"):
+        survey.load_data()
+
+    survey = Survey(1, LimeAPI(lime_server.url, "user", "secret"))
+    with pytest.raises(TypeError, match=r"load_data\(\)"):
+        asyncio.run(survey.load_data_async())
+    assert lime_server.calls == []
@@ -0,0 +1,80 @@
+import pytest
+from loguru import logger
+from tinyrpc import InvalidReplyError
+from tinyrpc.exc import RPCError
+from tinyrpc.protocols.jsonrpc import (
+    JSONRPCBatchResponse,
+    JSONRPCErrorResponse,
+    JSONRPCProtocol,
+)
+
+from coconut import LimeAPI
+
+
+@pytest.fixture
+def log_messages():
+    messages = []
+    handler_id = logger.add(messages.append, level="WARNING")
+    yield messages
+    logger.remove(handler_id)
+
+
+def test_get_survey_metadata_sends_single_requests_by_default(lime_server):
+    with LimeAPI(lime_server.url, "user", "secret") as lime:
+        survey_props, language_props, questions = lime.get_survey_metadata(1)
+
+    assert survey_props == {"sid": 1}
+    assert language_props == {"surveyls_title": "Colors"}
+    assert [q["title"] for q in questions] == ["SQ001", "Q1"]
+    assert all(isinstance(r, dict) for r in lime_server.requests)
+
+
+def test_batch_call_sends_batch_requests(lime_server):
+    lime_server.batch_replies = True
+    with LimeAPI(lime_server.url, "user", "secret", batch_requests=True) as lime:
+        lime._max_batch_size = 2
+        survey_props, language_props, questions = lime.get_survey_metadata(1)
+
+    assert survey_props == {"sid": 1}
+    assert language_props == {"surveyls_title": "Colors"}
+    assert [q["title"] for q in questions] == ["SQ001", "Q1"]
+    batches = [r for r in lime_server.requests if isinstance(r, list)]
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert all(r["params"]["sSessionKey"] == "abc123" for r in batches[0])
+
+
+def test_batch_call_raises_error_replies(lime_server):
+    lime_server.batch_replies = True
+    with LimeAPI(lime_server.url, "user", "secret", batch_requests=True) as lime:
+        with pytest.raises(RPCError, match="Unknown method"):
+            lime.batch_call([("get_summary", {}), ("delete_survey", {})])
+
+
+def test_batch_call_falls_back_to_single_requests(lime_server, log_messages):
+    with LimeAPI(lime_server.url, "user", "secret", batch_requests=True) as lime:
+        survey_props, _, _ = lime.get_survey_metadata(1)
+        assert not lime.batch_requests
+        assert lime.batch_call([("get_survey_properties", {})]) == [{"sid": 1}]
+
+    assert survey_props == {"sid": 1}
+    # The rejected batch is the only request that isn't a single request object
+    assert [isinstance(r, list) for r in lime_server.requests].count(True) == 1
+    assert [m.record["level"].name for m in log_messages] == ["WARNING"]
+    assert "Batch request not supported" in log_messages[0]
+
+
+def test_parse_reply_reads_batch_replies():
+    LimeAPI._patch_rpc_protocol()
+    protocol = JSONRPCProtocol()
+    reply = protocol.parse_reply(
+        b'[{"id": 1, "result": "ok", "error": null},'
+        b' {"id": 2, "result": null, "error": "Invalid session key"}]'
+    )
+
+    assert isinstance(reply, JSONRPCBatchResponse)
+    assert [r.unique_id for r in reply] == [1, 2]
+    assert reply[0].result == "ok"
+    assert isinstance(reply[1], JSONRPCErrorResponse)
+    assert reply[1].error == "Invalid session key"
+    with pytest.raises(InvalidReplyError):
+        protocol.parse_reply(b"[]")
@@ -0,0 +1,124 @@
+import datetime
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("xlsxwriter")
+openpyxl = pytest.importorskip("openpyxl")
+
+from coconut import Response, Survey
+
+
+QUESTIONS = [
+    {
+        "id": {"qid": 11},
+        "title": "SQ001",
+        "parent_qid": 10,
+        "sid": 1,
+        "gid": 2,
+        "type": "M",
+        "question": "Red",
+    },
+    {
+        "id": {"qid": 10},
+        "title": "Q1",
+        "parent_qid": 0,
+        "sid": 1,
+        "gid": 2,
+        "type": "M",
+        "question": "<p>Favorite colors?</p>",
+    },
+]
+
+RESPONSES = [
+    {"id": "2", "Q1[SQ001]": None, "score": 1.5},
+    {"id": "1", "Q1[SQ001]": "Y", "score": 3},
+]
+
+
+def load_survey(response_cls=Response):
+    class _Survey(Survey):
+        @property
+        def response_cls(self):
+            return response_cls
+
+    survey = _Survey(survey_id=1, lime_api=None)
+    survey._load_questions(QUESTIONS)
+    survey._load_responses(RESPONSES)
+    return survey
+
+
+def test_workbook_round_trips_responses(tmp_path):
+    survey = load_survey()
+    filepath = tmp_path / "survey.xlsx"
+    survey.to_excel(filepath)
+
+    responses = pd.read_excel(filepath, sheet_name="Responses", index_col=0)
+    pd.testing.assert_frame_equal(
+        responses, survey.dataframe, check_dtype=False, check_index_type=False
+    )
+    questions = pd.read_excel(filepath, sheet_name="Questions", index_col=0)
+    assert list(questions["title"]) == ["Q1", "Q1[SQ001]"]
+
+
+def test_workbook_writes_non_scalar_values_as_strings(tmp_path):
+    class ListResponse(Response):
+        def dict(self):
+            return {**self.data, "colors": ["Red", "Blue"]}
+
+    survey = load_survey(ListResponse)
+    filepath = tmp_path / "survey.xlsx"
+    survey.to_excel(filepath)
+
+    responses = pd.read_excel(filepath, sheet_name="Responses", index_col=0)
+    assert list(responses["colors"]) == ["['Red', 'Blue']"] * 2
+
+
+def test_workbook_writes_dates_with_date_formats(tmp_path):
+    class DateResponse(Response):
+        def dict(self):
+            return {
+                **self.data,
+                "submitdate": pd.Timestamp("2020-07-01 12:30:00"),
+                "startdate": datetime.date(2020, 7, 1),
+            }
+
+    survey = load_survey(DateResponse)
+    filepath = tmp_path / "survey.xlsx"
+    survey.to_excel(filepath)
+
+    worksheet = openpyxl.load_workbook(filepath)["Responses"]
+    header = [cell.value for cell in worksheet[1]]
+    submitdate = worksheet.cell(2, header.index("submitdate") + 1)
+    startdate = worksheet.cell(2, header.index("startdate") + 1)
+    assert submitdate.value == datetime.datetime(2020, 7, 1, 12, 30)
+    assert submitdate.number_format == "YYYY-MM-DD HH:MM:SS"
+    assert startdate.value == datetime.datetime(2020, 7, 1)
+    assert startdate.number_format == "YYYY-MM-DD"
+
+
+def test_workbook_writes_infinities_as_strings(tmp_path):
+    class InfResponse(Response):
+        def dict(self):
+            sign = 1 if self.data["id"] == "1" else -1
+            return {**self.data, "ratio": sign * float("inf")}
+
+    survey = load_survey(InfResponse)
+    filepath = tmp_path / "survey.xlsx"
+    survey.to_excel(filepath)
+
+    worksheet = openpyxl.load_workbook(filepath)["Responses"]
+    header = [cell.value for cell in worksheet[1]]
+    ratio = header.index("ratio")
+    answer = header.index("Q1[SQ001]")
+    rows = list(worksheet.iter_rows(min_row=2, values_only=True))
+    assert [row[ratio] for row in rows] == ["inf", "-inf"]
+    assert [row[answer] for row in rows] == ["Y", None]
+
+
+def test_dataframe_is_a_copy_of_the_loaded_responses():
+    survey = load_survey()
+    dataframe = survey.dataframe
+    dataframe.loc[0, "score"] = 100
+
+    assert list(survey.dataframe["score"]) == [3, 1.5]